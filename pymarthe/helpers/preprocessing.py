@@ -160,7 +160,8 @@ def extract_model_geology(mm, shpout, epsg=2154, on_grid=False):
     if os.path.exists('_temp_'):
         shutil.rmtree('_temp_')
     os.mkdir('_temp_')
-    open(os.path.join('_temp_', '_temp_.zip'), 'wb').write(r.content)
+    with open(os.path.join('_temp_', '_temp_.zip'), 'wb') as f:
+        f.write(r.content)
 
     # ---- Read geology shapefile of whole France country 
     #     (since `bbox` and mask attribut doesn't work on 0.11.0)
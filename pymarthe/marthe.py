@@ -4,12 +4,13 @@ Designed for structured and nested grid.
 """
 
 import os, sys
+import platform
 import warnings
-import subprocess as sp
 from shutil import which
 from copy import deepcopy
-import queue 
-import threading
+from collections import deque
+import asyncio
+import subprocess as sp
 import numpy as np
 import pandas as pd
 from datetime import datetime
@@ -21,12 +22,52 @@ from .utils import marthe_utils, shp_utils, pest_utils
 
 encoding = 'latin-1'
 
+# ---- Message marking a successful Marthe run in stdout
+NORMAL_MSG = 'normal termination'
+
+# ---- Maximum length (bytes) of a Marthe stdout line read by .run_model()
+RUN_LINE_LIMIT = 1 << 24
+
+# ---- Resolved executable paths (only successful lookups are kept)
+_exe_paths = {}
+
+
+def _which_exe(exe_name):
+    """
+    Resolve (and cache) the full path of an executable.
+    Returns None if the executable could not be found.
+    """
+    if exe_name not in _exe_paths:
+        exe = which(exe_name)
+        # -- Try which() function for window user
+        if exe is None and platform.system() in 'Windows':
+            exe = which(exe_name + '.exe')
+        if exe is None:
+            return None
+        _exe_paths[exe_name] = exe
+    return _exe_paths[exe_name]
+
+
+def _run_coroutine(coro):
+    """
+    Run a coroutine to completion in a new event loop.
+    On Windows, a Proactor loop is used since subprocesses are not
+    supported by the Selector loop (default loop before Python 3.8).
+    """
+    if sys.platform == 'win32':
+        loop = asyncio.ProactorEventLoop()
+        try:
+            return loop.run_until_complete(coro)
+        finally:
+            loop.close()
+    return asyncio.run(coro)
+
 
 class MartheModel():
     """
     Wrapper MARTHE --> Python
     """
-    def __init__(self, rma_path, spatial_index = False, modelgrid= False):
+    def __init__(self, rma_path, spatial_index = False, modelgrid= False, dtype=np.float64):
         """
         Parameters
         ----------
@@ -74,6 +115,12 @@ class MartheModel():
 
                           Default is False.
 
+        dtype (np.dtype, optional) : floating point type of gridded field values.
+                                     Using np.float32 halves the memory footprint
+                                     of all fields. Cell coordinates (x, y) are
+                                     always kept as float64.
+                                     Default is np.float64.
+
 
         Examples
         --------
@@ -106,9 +153,19 @@ class MartheModel():
         # ---- Store hws (Hangling Wall State)
         self.hws = 'explicit' if len(self.layers_infos.epon_sup.unique()) == 1 else 'implicit'
 
+        # ---- Set floating point type of field values
+        self.dtype = np.dtype(dtype)
+
         # ---- Store model grid infos from permh field
         self.imask = self.build_imask()
 
+        # ---- Store flat indices of active cells (avoid repeated boolean masking)
+        #      Note: indices refer to the full .imask records, i.e. they span
+        #            EVERY layer and nested grid (not the main grid only), so
+        #            they can only be used on whole field data (all layers/inests)
+        self.active_idx = np.flatnonzero(self.imask.data['value'])
+        self.n_active = self.active_idx.size
+
         # ---- Set number of cell by layer
         self.ncpl = int(len(self.imask.data)/self.nlay)
 
@@ -398,28 +455,21 @@ class MartheModel():
         _outcrop = self.get_outcrop().data['value'].reshape((self.nlay, self.ncpl)) # outcrop array
         _outcrop[np.isin(_outcrop,  [9999, -9999])] = np.nan
 
-        # -- Build a empty top array with right shape 
-        _top = np.empty((self.nlay, self.ncpl))
-        # -- Iterate 
-        for icell in range(self.ncpl):
-            for ilay in range(self.nlay):
-
-                # -- Set arrays to concatenate according to model explicity on geometry
-                if self.hws == 'explicit':
-                    arrs = [_hsubs[:ilay, icell], _topog[:1, icell]]
-                else:
-                    arrs = [ _hsubs[:ilay, icell], _sepon[:ilay+1, icell], _topog[:1, icell]]
-                # -- Compute z minimum above substratum
-                ztop = np.fmin.reduce(np.concatenate(arrs))
-                # -- If current cell's top is outcroping
-                if np.isnan(ztop):
-                    oc = np.fmax.reduce(_outcrop[:ilay+1, icell])
-                    if np.isnan(oc):
-                        ztop = np.nan
-                    elif ilay <= int(oc):
-                        ztop = _hsubs[int(oc), icell]
-                # -- Store cell top
-                _top[ilay, icell] = ztop
+        # -- Compute z minimum above substratum for all cells at once
+        #    (NaN-ignoring cumulative minimum of overlying bottoms, sepon and topog)
+        _hsubs_above = np.vstack((np.full((1, self.ncpl), np.nan),
+                                  np.fmin.accumulate(_hsubs, axis=0)[:-1]))
+        _top = np.fmin(_hsubs_above, _topog[0])
+        if self.hws == 'implicit':
+            _top = np.fmin(_top, np.fmin.accumulate(_sepon, axis=0))
+
+        # -- Manage outcroping cells (no top found above)
+        oc = np.fmax.accumulate(_outcrop, axis=0)
+        ioc = np.where(np.isnan(oc), -1, oc).astype(int)
+        lays, cells = np.indices((self.nlay, self.ncpl))
+        is_oc = np.isnan(_top) & (ioc >= 0) & (lays <= ioc)
+        _top[is_oc] = _hsubs[ioc[is_oc], cells[is_oc]]
+
         # -- Rectify first layer by topog
         _top = np.vstack((_topog[0], _top[1:]))
 
@@ -491,8 +541,9 @@ class MartheModel():
         """
         # ---- Load permh field
         imask = MartheField('imask', self.mlfiles['permh'], self)
-        # ---- Change data to binary
-        imask.data['value'] = (imask.data['value'] != 0).astype(int)
+        # ---- Change data to binary inplace (no intermediate integer array)
+        values = imask.data['value']
+        np.not_equal(values, 0, out=values, casting='unsafe')
         # ---- Return MartheField instance
         return imask
 
@@ -596,7 +647,7 @@ class MartheModel():
 
 
     @classmethod
-    def from_config(cls, configfile):
+    def from_config(cls, configfile, dtype=np.float64):
         """
         Load an existing Marthe model from a configuration file written from 
         pymarthe.MartheOptim.write_config(). The return MartheModel instance
@@ -609,6 +660,10 @@ class MartheModel():
         Parameters:
         ----------
         configfile (str) : parametrization configuration file.
+        dtype (np.dtype, optional) : floating point type of gridded field values
+                                     (not stored in the configuration file).
+                                     See MartheModel().
+                                     Default is np.float64.
 
         Returns:
         --------
@@ -619,10 +674,13 @@ class MartheModel():
         mmfrom = MartheModel.from_config('myconfiguration.config')
 
         """
+        # -- Drop memoized grids (files may have been rewritten by a previous run)
+        marthe_utils.clear_grid_cache()
+
         # -- Build MartheModel from configuration file
         hdic, pdics, _ = pest_utils.read_config(configfile)
         si = None if hdic['Model spatial index'] == 'None' else hdic['Model spatial index']
-        mm = cls(hdic['Model full path'], spatial_index=si)
+        mm = cls(hdic['Model full path'], spatial_index=si, dtype=dtype)
 
         # -- Iterate over parameter dictionaries
         for pdic in pdics:
@@ -766,6 +824,30 @@ class MartheModel():
 
 
 
+    def clear_grid_cache(self):
+        """
+        Function to clear memoized grid files.
+        Useful when grid files are edited externally
+        within the same modification time resolution.
+        Wrapper to marthe_utils.clear_grid_cache().
+
+        Parameters:
+        ----------
+        self : MartheModel instance
+
+        Returns:
+        --------
+        Clear grid files cache inplace
+
+        Examples:
+        --------
+        mm = MartheModel(rma_file)
+        mm.clear_grid_cache()
+        """
+        marthe_utils.clear_grid_cache()
+
+
+
     def get_outcrop(self, as_2darray=False, base=0):
         """
         Function to get outcropping layer number
@@ -1323,13 +1405,124 @@ class MartheModel():
 
 
 
+    async def _run_model_async(self, argv, verbose=False, buff_size=None):
+        """
+        Coroutine running the Marthe executable as a subprocess
+        and reading its stdout line by line with timestamps.
+        Used by .run_model().
+
+        Parameters
+        ----------
+        argv (list) : executable and command line arguments.
+        verbose (bool, optional) : echo run information to screen
+                                   Default is False.
+        buff_size (int, optional) : maximum number of stdout lines kept.
+                                    If None, all lines are kept.
+                                    Default is None.
+
+        Returns
+        -------
+        (success, buff)
+        success (bool) : True if the normal termination message was read
+        buff (list) :  stdout
+        """
+        # ---- Initialize variable
+        success = False
+        buff = [] if buff_size is None else deque(maxlen=buff_size)
+        last = datetime.now()
+        lastsec = 0.
+
+        # ---- Run the model (stderr redirected to stdout)
+        proc = await asyncio.create_subprocess_exec(
+                                *argv,
+                                stdout=asyncio.subprocess.PIPE,
+                                stderr=asyncio.subprocess.STDOUT,
+                                limit=RUN_LINE_LIMIT)
+
+        # ---- Read stdout as it is produced
+        async for raw_line in proc.stdout:
+            line = raw_line.decode(encoding).lower().strip()
+            if line != '':
+                now = datetime.now()
+                dt = now - last
+                tsecs = dt.total_seconds() - lastsec
+                line = "elapsed:{0}-->{1}".format(tsecs, line)
+                lastsec = tsecs + lastsec
+                buff.append(line)
+                if not verbose:
+                    print(line)
+                # -- Check run state as lines stream by
+                if NORMAL_MSG in line:
+                    success = True
+
+        # ---- Wait for the process to terminate
+        await proc.wait()
+
+        # ---- Return run state and stdout lines
+        return success, list(buff)
+
+
+
+    def _run_model_sync(self, argv, verbose=False, buff_size=None):
+        """
+        Synchronous counterpart of ._run_model_async() using subprocess.Popen.
+        Used by .run_model() when an event loop is already running
+        (e.g. Jupyter), where asyncio subprocesses can not be awaited.
+
+        Parameters
+        ----------
+        argv (list) : executable and command line arguments.
+        verbose (bool, optional) : echo run information to screen
+                                   Default is False.
+        buff_size (int, optional) : maximum number of stdout lines kept.
+                                    If None, all lines are kept.
+                                    Default is None.
+
+        Returns
+        -------
+        (success, buff)
+        success (bool) : True if the normal termination message was read
+        buff (list) :  stdout
+        """
+        # ---- Initialize variable
+        success = False
+        buff = [] if buff_size is None else deque(maxlen=buff_size)
+        last = datetime.now()
+        lastsec = 0.
+
+        # ---- Run the model (stderr redirected to stdout)
+        with sp.Popen(argv, stdout=sp.PIPE, stderr=sp.STDOUT) as proc:
+            # -- Read stdout as it is produced
+            for raw_line in proc.stdout:
+                line = raw_line.decode(encoding).lower().strip()
+                if line != '':
+                    now = datetime.now()
+                    dt = now - last
+                    tsecs = dt.total_seconds() - lastsec
+                    line = "elapsed:{0}-->{1}".format(tsecs, line)
+                    lastsec = tsecs + lastsec
+                    buff.append(line)
+                    if not verbose:
+                        print(line)
+                    # -- Check run state as lines stream by
+                    if NORMAL_MSG in line:
+                        success = True
+
+        # ---- Return run state and stdout lines
+        return success, list(buff)
+
+
+
+
     def run_model(self,exe_name = 'marthe', rma_file = None, 
                       silent = True, verbose=False, pause=False,
-                      report=False, cargs=None):
+                      report=False, cargs=None, buff_size=None):
         """
-        Run Marthe model using subprocess.Popen. It communicates 
+        Run Marthe model as an asyncio subprocess. It communicates 
         with the model's stdout asynchronously and reports progress 
         to the screen with timestamps
+        Note: if an event loop is already running (e.g. Jupyter),
+              the model is run with subprocess.Popen instead.
 
         Parameters
         ----------
@@ -1345,9 +1538,14 @@ class MartheModel():
                                  Default is False.
         report (bool, optional) : save stdout lines to a list (buff) 
                                   which is returned by the method
-                                  Default is True.
+                                  Default is False.
         cargs (str/list, optional) : additional command line arguments to pass to the executable.
                                      Default is None.
+        buff_size (int, optional) : maximum number of stdout lines kept in
+                                    the returned buff (only the last ones).
+                                    Useful to bound memory on long verbose runs.
+                                    If None, all stdout lines are returned.
+                                    Default is None.
 
         Returns
         -------
@@ -1355,23 +1553,12 @@ class MartheModel():
         success (bool) : Binary success of the run 
         buff (list) :  stdout
         """
-        # ---- Initialize variable
-        success = False
-        buff = []
-        normal_msg='normal termination'
-
         # ---- Force model to run as silent if required
         if silent:
             self.make_silent()
 
         # ---- Check to make sure that program and namefile exist
-        exe = which(exe_name)
-        if exe is None:
-            # -- Try which() function for window user 
-            import platform
-            if platform.system() in 'Windows':
-                    exe = which(exe_name + '.exe')
-
+        exe = _which_exe(exe_name)
         if exe is None:
             s = 'The program {} does not exist or is not executable.'.format(
                 exe_name)
@@ -1382,67 +1569,31 @@ class MartheModel():
         if rma_file is None : 
             rma_file = os.path.join(self.mldir, self.rma_file)
 
-        # ---- Simple function for the thread to target
-        def q_output(output, q):
-            for line in iter(output.readline, b''):
-                q.put(line)
-
-        # ---- Create a list of arguments to pass to Popen
-        argv = [exe_name]
+        # ---- Create a list of arguments to pass to the subprocess
+        argv = [exe]
         if rma_file is not None:
             argv.append(rma_file)
 
-        # ---- Add additional arguments to Popen arguments
+        # ---- Add additional arguments to subprocess arguments
         if cargs is not None:
             cargs = [arg for arg in cargs if isinstance(cargs, str)]
             for t in cargs:
                 argv.append(t)
 
-        # ---- Run the model with Popen
-        proc = sp.Popen(argv, stdout=sp.PIPE, stderr=sp.STDOUT)
+        # ---- Run the model and read its stdout asynchronously
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            success, buff = _run_coroutine(self._run_model_async(argv, verbose, buff_size))
+        else:
+            # -- Already inside an event loop (e.g. Jupyter): synchronous run
+            #    (asyncio subprocesses in a worker thread require a child
+            #    watcher before Python 3.8 on Unix)
+            success, buff = self._run_model_sync(argv, verbose, buff_size)
 
-        # ---- Some tricks for the async stdout reading
-        q = queue.Queue()
-        thread = threading.Thread(target=q_output, args=(proc.stdout, q))
-        thread.daemon = True
-        thread.start()
-        failed_words = ["fail", "error"]
-        last = datetime.now()
-        lastsec = 0.
-        while True:
-            try:
-                line = q.get_nowait()
-            except queue.Empty:
-                pass
-            else:
-                if line == '':
-                    break
-                line = line.decode('latin-1').lower().strip()
-                if line != '':
-                    now = datetime.now()
-                    dt = now - last
-                    tsecs = dt.total_seconds() - lastsec
-                    line = "elapsed:{0}-->{1}".format(tsecs, line)
-                    lastsec = tsecs + lastsec
-                    buff.append(line)
-                    if not verbose:
-                        print(line)
-                    for fword in failed_words:
-                        if fword in line:
-                            success = False
-                            break
-            if proc.poll() is not None:
-                break
-        proc.wait()
-        thread.join(timeout=1)
-        buff.extend(proc.stdout.readlines())
-        proc.stdout.close()
-        # -- Examine run buff
-        for line in buff:
-            if normal_msg in line:
-                print("success")
-                success = True
-                break
+        # -- Report run state
+        if success:
+            print("success")
 
         if pause:
             input('Press Enter to continue...')
@@ -1698,6 +1849,9 @@ class SpatialReference():
     """
     Inspired from FloPy, for compatibility with PyEMU
     """
+    __slots__ = ('nrow', 'ncol', 'active_idx', 'delr', 'delc',
+                 'xcc', 'ycc', '_xcentergrid', '_ycentergrid')
+
     def __init__(self, mm):
         """
         Parameters
@@ -1706,6 +1860,45 @@ class SpatialReference():
         """
         mg = mm.imask.to_grids(layer=0, inest=0)[0]
         self.nrow, self.ncol = mg.nrow, mg.ncol
+        # -- Flat indices of active cells (pack/unpack parameter vectors)
+        #    Note: spans every layer and nested grid (see MartheModel.active_idx)
+        self.active_idx = mm.active_idx
+        # -- Main grid cell sizes (along rows/columns) and cell centers
+        self.delr = np.ascontiguousarray(mg.dx, dtype=float)
+        self.delc = np.ascontiguousarray(mg.dy, dtype=float)
+        self.xcc = np.ascontiguousarray(mg.xcc, dtype=float)
+        self.ycc = np.ascontiguousarray(mg.ycc, dtype=float)
+        # -- Cell center grids are only built on first access
+        self._xcentergrid, self._ycentergrid = None, None
+
+
+    def _build_centergrids(self):
+        """
+        Build (once) the 2D-arrays of x/y cell centers.
+        """
+        xg, yg = np.meshgrid(self.xcc, self.ycc)
+        self._xcentergrid = np.ascontiguousarray(xg)
+        self._ycentergrid = np.ascontiguousarray(yg)
+
+
+    @property
+    def xcentergrid(self):
+        """
+        2D-array (nrow, ncol) of x cell centers of the main grid.
+        """
+        if self._xcentergrid is None:
+            self._build_centergrids()
+        return self._xcentergrid
+
+
+    @property
+    def ycentergrid(self):
+        """
+        2D-array (nrow, ncol) of y cell centers of the main grid.
+        """
+        if self._ycentergrid is None:
+            self._build_centergrids()
+        return self._ycentergrid
 
 
     def __str__(self):
@@ -11,8 +11,6 @@ import numpy.lib.recfunctions
 import pandas as pd
 from copy import copy, deepcopy
 import shutil
-import matplotlib.pyplot as plt
-from matplotlib.collections import PathCollection
 from .utils import marthe_utils, shp_utils, pest_utils
 from .utils.grid_utils import MartheGrid
 
@@ -66,8 +64,9 @@ class MartheField():
         self.dmv = dmv
         self.use_imask = use_imask
         self.set_data(data)
-        self.maxlayer = len(self.to_grids(inest=0))
-        self.maxnest = len(self.to_grids(layer=0)) - 1 # inest = 0 is the main grid
+        # ---- Count layers/nests from records (no need to build MartheGrid instances)
+        self.maxlayer = np.unique(self.data['layer'][self.data['inest'] == 0]).size
+        self.maxnest = np.unique(self.data['inest'][self.data['layer'] == 0]).size - 1 # inest = 0 is the main grid
 
         # ---- Set property style
         self._proptype = 'grid'
@@ -216,27 +215,20 @@ class MartheField():
 
         """
         # ---- Manage layer input
-        if layer is None:
-            layers = np.unique(self.data['layer'])
-        else: 
+        if layer is not None:
             layers = marthe_utils.make_iterable(layer)
         # ---- Manage inest input
-        if inest is None:
-            inests = np.unique(self.data['inest'])
-        else: 
+        if inest is not None:
             inests = marthe_utils.make_iterable(inest)
-        # ---- Manage masked_values
-        mv = marthe_utils.make_iterable(masked_values)
-        # ---- Apply required mask
-        mask   = np.logical_and.reduce([np.isin(self.data['layer'], layers),
-                                        np.isin(self.data['inest'], inests),
-                                        ~np.isin(self.data['value'], mv)])
-        # ---- Return as mask if required
-        if as_mask:
-            return mask
         # ---- Return as array
-        if as_array:
-            arrays = []
+        if np.logical_and(as_array, not as_mask):
+            # -- Fetch all layer/inest ids only when required
+            if layer is None:
+                layers = np.unique(self.data['layer'])
+            if inest is None:
+                inests = np.unique(self.data['inest'])
+            arr3d = None
+            k = 0
             # -- Subset by layer(s)
             for l in layers:
                 ldata = self.data[self.data['layer'] == l]
@@ -246,10 +238,26 @@ class MartheField():
                     # -- Fetch nrow, ncol of the current grid
                     nrow = np.max(ndata['i']) + 1
                     ncol = np.max(ndata['j']) + 1
-                    # -- Rebuild array by reshaping with nrow, ncol
-                    arrays.append(ndata['value'].reshape(nrow,ncol))
+                    # -- Allocate a single C-contiguous 3D-array once
+                    if arr3d is None:
+                        arr3d = np.empty((len(layers)*len(inests), nrow, ncol),
+                                         dtype=ndata['value'].dtype)
+                    # -- Fill it by reshaping with nrow, ncol
+                    arr3d[k] = ndata['value'].reshape(nrow,ncol)
+                    k += 1
             # -- Returning array
-            return np.array(arrays)
+            return np.array([]) if arr3d is None else arr3d
+        # ---- Manage masked_values
+        mv = marthe_utils.make_iterable(masked_values)
+        # ---- Apply required mask (layer/inest only tested if provided)
+        mask = ~np.isin(self.data['value'], mv)
+        if layer is not None:
+            mask &= np.isin(self.data['layer'], layers)
+        if inest is not None:
+            mask &= np.isin(self.data['inest'], inests)
+        # ---- Return as mask if required
+        if as_mask:
+            return mask
         # -- Returning as recarray
         else:
             return self.data[mask]
@@ -280,6 +288,11 @@ class MartheField():
         --------
         Set field data inplace.
 
+        Note: large Marthe property files are memoized on (path, modification
+              time, size). If a file is edited externally with the same size
+              within the modification time resolution, clear the cache first
+              with MartheModel.clear_grid_cache().
+
         Examples:
         --------
         mf.set_data(permh_recarray) 
@@ -298,7 +311,8 @@ class MartheField():
 
         # ---- Manage Marthe filename as input
         if np.logical_and.reduce([_str, _none]):
-            grids = marthe_utils.read_grid_file(data)
+            # -- Grids are only read to build records (cached grids are not modified)
+            grids = marthe_utils.read_grid_file_cached(data)
             rec =  self.grids2rec(grids)
             self.data = self.get_masked(rec)
 
@@ -316,10 +330,14 @@ class MartheField():
                 self.data['value'][mask] = data
             except:
                 # -- Copy .imask recarray and change value by provided float/int
-                rec = deepcopy(self.mm.imask.data)
-                mask = self.mm.imask.get_data(layer=layer, inest=inest,
-                            masked_values=self.dmv, as_mask=True)
-                rec['value'][mask] = data
+                rec = self.mm.imask.data.copy()
+                if _none:
+                    # -- Active cells are already known (no mask pass over .imask)
+                    rec['value'][self.mm.active_idx] = data
+                else:
+                    mask = self.mm.imask.get_data(layer=layer, inest=inest,
+                                masked_values=self.dmv, as_mask=True)
+                    rec['value'][mask] = data
                 # -- Setting recarray as main .data
                 self.data = rec
 
@@ -334,6 +352,12 @@ class MartheField():
             assert len(data.shape) == 3, err_msg
             self.data = self.get_masked(self._3d2rec(data))
 
+        # ---- Store values with the model floating point type
+        if self.data.dtype['value'] != self.mm.dtype:
+            dt = [(n, self.mm.dtype if n == 'value' else self.data.dtype[n])
+                  for n in self.data.dtype.names]
+            self.data = self.data.astype(dt)
+
 
 
     def get_masked(self, rec):
@@ -357,8 +381,8 @@ class MartheField():
         # -- Model dependent grid (only contains value)
         if np.logical_and(self.use_imask, self.field.casefold() != 'imask'):
             mrec = deepcopy(self.mm.imask.data)
-            mask = self.mm.imask.get_data(masked_values=self.dmv, as_mask=True)
-            mrec['value'][mask] = rec['value'][mask]
+            idx = self.mm.active_idx
+            mrec['value'][idx] = rec['value'][idx]
 
         # -- Independent grid (contains value and geometry)
         else:
@@ -395,26 +419,39 @@ class MartheField():
         # ---- Parse grid parameter file
         ptype, rec = pest_utils.parse_mgp_parfile(parfile, btrans)
 
+        # ---- Get field values (view) and not masked cells once
+        values = self.data['value']
+        valid = ~np.isin(values, dmv)
+
         # ---- Manage zone of piecewise constancy (zpc) data
-        if ptype == 'zpc':
-            # -- Iterate over recarray (layer, zone, value)
-            for l,z,v in rec:
-                # -- Mask and set
-                mask = np.logical_and.reduce(
-                            [ self.get_data(layer=l, masked_values=dmv, as_mask=True),
-                              izone.data['value'] == z]
-                              )
-                self.data['value'][mask] = v
+        if ptype == 'zpc' and len(rec) > 0:
+            # -- Build (layer, -zone) lookup tables of values
+            lays, zones = rec['layer'].astype(int), -rec['zone'].astype(int)
+            lut = np.zeros((lays.max()+1, zones.max()+1))
+            isset = np.zeros(lut.shape, dtype=bool)
+            lut[lays, zones], isset[lays, zones] = rec['bvalue'], True
+            # -- Select candidate zpc cells in a single pass
+            l, z = self.data['layer'], -izone.data['value']
+            cells = np.flatnonzero(valid & (z > 0) & (l < lut.shape[0]) & (z < lut.shape[1]))
+            cl, cz = l[cells].astype(int), z[cells].astype(int)
+            # -- Set values of zpc cells inplace
+            found = isset[cl, cz]
+            values[cells[found]] = lut[cl[found], cz[found]]
 
         # ---- Manage pilot point (pp) data
         if ptype == 'pp':
-            # -- Mask and set 
+            # -- Build zone mask and combine layer and validity conditions inplace
             l,z,v = rec
-            mask = np.logical_and.reduce(
-                            [ self.get_data(layer=l, masked_values=dmv, as_mask=True),
-                              izone.data['value'] == z]
-                              )
-            self.data['value'][mask] = v
+            mask = np.equal(izone.data['value'], z)
+            mask &= self.data['layer'] == l
+            mask &= valid
+            # -- Check consistency between interpolated values and zone cells
+            n = np.count_nonzero(mask)
+            err_msg = f"ERROR : {len(v)} interpolated values for {n} cells "
+            err_msg += f"in layer {l}, zone {z} ({parfile})."
+            assert n == len(v), err_msg
+            # -- Scatter values sequentially in zone cells
+            np.place(values, mask, v)
 
 
 
@@ -630,8 +667,8 @@ class MartheField():
         else:
             f = filename
 
-        # ---- Extract refine levels dictionary
-        rl = self.mm.extract_refine_levels()
+        # ---- Fetch refine levels dictionary (already extracted by the MartheModel)
+        rl = self.mm.rlevels
 
         # ---- Write field data from list of MartheGrid instance
         with open(f, 'w', encoding = marthe_utils.encoding) as f:
@@ -644,6 +681,9 @@ class MartheField():
                                 keep_uniform_fmt = keep_uniform_fmt )
                                                                         )
 
+        # ---- Drop memoized grids (file rewritten, possibly with the same size and mtime)
+        marthe_utils.clear_grid_cache()
+
 
 
 
@@ -790,6 +830,10 @@ class MartheField():
         ax.set_title('Field (layer = 6)', fontsize=14)
 
         """
+        # ---- Import matplotlib only when plotting
+        import matplotlib.pyplot as plt
+        from matplotlib.collections import PathCollection
+
         # ---- Perform a bunch of assertions on `layer` and `inest` arguments
         err_msg = f"`layer` must be an integer between 0 and {self.maxlayer -1}."
         assert isinstance(layer, int), err_msg
@@ -1339,6 +1383,8 @@ class MartheFieldSeries():
         except ImportError:
             print('ERROR : Could not load `imageio` module. ' \
                   'Try `pip install imageio`.')
+        # ---- Import matplotlib only when plotting
+        import matplotlib.pyplot as plt
 
         # -- Check field
         self.check_fieldname(field)
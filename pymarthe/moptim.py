@@ -7,9 +7,9 @@ Designed for structured grid
 import os, sys
 import numpy as np
 import pandas as pd 
-import pyemu
 import warnings
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 from pymarthe.marthe import MartheModel
 from pymarthe.mobs import MartheObs
@@ -77,6 +77,8 @@ class MartheOptim():
         self.obs, self.param = {}, {}
         # ---- Fetch available observation localisation names
         self.available_locnmes = marthe_utils.read_histo_file(mm.mlfiles['histo']).index
+        # -- Count occurences once (constant time existence/unicity checks)
+        self._locnme_counts = self.available_locnmes.value_counts()
         # ---- Set commun no data values
         self.nodata = NO_DATA_VALUES
         # ---- Set parameter and observation folder
@@ -251,11 +253,10 @@ class MartheOptim():
         locnme = 'mylocname'
         exi, uni = moptim.check_loc(locnme)
         """
-        # ---- Get existence if required
-        exi = locnme in self.available_locnmes
-        # ---- Get unicity
-        mask = self.available_locnmes.str.fullmatch(locnme).tolist()
-        uni = mask.count(True) <= 1
+        # ---- Get number of occurences in .histo file
+        n = self._locnme_counts.get(locnme, 0)
+        # ---- Get existence and unicity
+        exi, uni = n > 0, n <= 1
         # ---- Error handling
         if error == 'raise':
             hf = self.mm.mlfiles['histo']
@@ -346,7 +347,86 @@ class MartheOptim():
             assert ('value' in data.columns), err_msg
             # -- Get locnme if not provided
             locnme = f'loc{str(self.get_nlocs()).zfill(3)}' if locnme is None else locnme
-        
+
+        # ---- Add observation set
+        self._add_obs_df(df, locnme, obsfile, datatype, check_loc, **kwargs)
+
+
+
+    def add_obs_batch(self, data, locnme = None, datatype = 'head',
+                            check_loc = True, nodata = None, max_workers = None, **kwargs):
+        """
+        Add and set multiple observation sets at once.
+        Observation files are read concurrently before being
+        added in the provided order (see .add_obs()).
+
+        Parameters:
+        ----------
+        data (list): observation data.
+                     Each item can be a path to a observation file
+                     or a pandas DataFrame (see .add_obs()).
+
+        locnme (list, optional) : observation location names (ex. BSS id).
+                                  Must have the same length as `data`.
+                                  If None, locnmes are inferred as in .add_obs().
+                                  Default is None.
+
+        datatype (str, optional): data type of observation values.
+                                  Default is 'head'.
+
+        check_loc (bool, optional) : check loc_name existence and unicity
+                                     Default is True.
+
+        nodata (list/None, optional) : no data values to remove reading observation data.
+                                       If None, all values are considered.
+                                       Default is None.
+
+        max_workers (int/None, optional) : maximum number of threads used to read
+                                           observation files.
+                                           If None, use ThreadPoolExecutor default.
+                                           Default is None.
+
+        **kwargs : additional arguments of .add_obs() shared by all
+                   observation sets (obgnme, trans, ...).
+
+        Returns:
+        --------
+        Add sets of observation inplace.
+
+        Examples:
+        --------
+        moptim.add_obs_batch(data = glob.glob('obs/*.dat'), datatype = 'head')
+
+        """
+        # ---- Manage inputs
+        data = list(marthe_utils.make_iterable(data))
+        locnmes = [None] * len(data) if locnme is None else list(marthe_utils.make_iterable(locnme))
+        err_msg = 'ERROR : `locnme` and `data` must have the same length. ' \
+                  f'Given : {len(locnmes)} and {len(data)}.'
+        assert len(locnmes) == len(data), err_msg
+
+        # ---- Read all observation files concurrently (I/O bound)
+        obsfiles = [d for d in data if isinstance(d, str)]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            dfs = list(executor.map(lambda f: marthe_utils.read_obsfile(f, nodata = nodata), obsfiles))
+        obs_dfs = dict(zip(obsfiles, dfs))
+
+        # ---- Add observation sets in provided order
+        for d, ln in zip(data, locnmes):
+            if isinstance(d, str):
+                ln = os.path.split(d)[1].split('.')[0] if ln is None else ln
+                self._add_obs_df(obs_dfs[d], ln, d, datatype, check_loc, **kwargs)
+            else:
+                self.add_obs(d, locnme = ln, datatype = datatype,
+                                check_loc = check_loc, nodata = nodata, **kwargs)
+
+
+
+    def _add_obs_df(self, df, locnme, obsfile, datatype, check_loc, **kwargs):
+        """
+        Build and store a MartheObs instance from an
+        observation DataFrame (see .add_obs()).
+        """
         # ---- Avoid adding same locnme multiple times
         if locnme in self.obs.keys():
             # -- Raise warning message
@@ -1427,6 +1507,7 @@ class MartheOptim():
             fr_file = None
 
         # -- Generate basic pst from io files
+        import pyemu
         pst = pyemu.Pst.from_io_files(*self.collect_pest_files())
 
         # -- Get clean DataFrame of all parameters
@@ -1439,7 +1520,8 @@ class MartheOptim():
         param_df['parnme'] = param_df['parnme'].str.replace('__','_')
         # am: inplace not allowed since pandas >= 2.0
         # param_df.set_index('parnme', drop = False, inplace = True)
-        param_df = param_df.set_index('parnme', drop = False)
+        # -- Set index from names inplace (avoid set_index() DataFrame copy)
+        param_df.index = pd.Index(param_df['parnme'], name='parnme')
 
         # -- Disable parameter transformation (already done by pyMarthe)
         param_df['partrans'] = 'none'
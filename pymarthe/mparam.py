@@ -7,27 +7,17 @@ layered parameterization
 """
 import os 
 import numpy as np
-from matplotlib import pyplot as plt 
 from .utils import marthe_utils, pest_utils, pp_utils, shp_utils
+# -- ZPCFMT is also imported to remain available as pymarthe.mparam.ZPCFMT
+from .utils.format_utils import ZPCFMT, ZPCFMTS, FFMT, IFMT, SFMT
 import pandas as pd 
-import pyemu
 from pymarthe.mfield import MartheField
 import warnings
 from copy import deepcopy
 
 
 # ---- SET UP FORMATTERS ---- #
-# ZPC name format (layer are 0-based within Python ; 1-based out of Python)
-ZPCFMT = lambda name, lay, zone: '{0}_zpc_l{1:02d}_z{2:02d}'.format(name,int(lay)+1,int(abs(zone)))
-FFMT = lambda x: "{0:<20.10E} ".format(float(x))
-IFMT = lambda x: "{0:<10d} ".format(int(x))
-def SFMT(item):
-    try:
-        s = "{0:<20s} ".format(item.decode())
-    except:
-         s = "{0:<20s} ".format(str(item))
-    return s
-
+# (shared formatters, see utils/format_utils.py)
 PP_NAMES = ["name","x","y","zone","value"]
 PP_FMT = {"name": SFMT, "x": FFMT, "y": FFMT, "zone": IFMT, "tpl": SFMT, "value": FFMT, "log_value": FFMT}
 
@@ -43,6 +33,10 @@ class MartheListParam():
     """
     Class for handling Marthe list-like properties. 
     """
+    __slots__ = ('parname', 'type', 'mobj', 'kmi', 'value_col', 'defaultvalue',
+                 'parnmes', 'trans', 'btrans', 'parchglim', 'parlbnd', 'parubnd',
+                 'pargp', 'scale', 'offset', 'dercom', 'param_df', 'parpath', 'tplpath')
+
     def __init__(self, parname, mobj, kmi, value_col = 'value', trans = 'none', 
                        btrans = 'none', defaultvalue=None, **kwargs):
         """
@@ -297,6 +291,11 @@ class MartheGridParam():
     """
     Class for handling Marthe grid-like properties.
     """
+    __slots__ = ('parname', 'type', 'mobj', 'nlay', 'defaultvalue', 'pp_data',
+                 'trans', 'btrans', 'izone', 'izone_file', 'zpc_df', 'pp_dic',
+                 '_lz_idx', '_lz_pairs', 'parchglim', 'parlbnd', 'parubnd',
+                 'pargp', 'scale', 'offset', 'dercom', 'parpath', 'tplpath')
+
     def __init__(self, parname, mobj, izone=None,  pp_data=None, trans = 'none', 
                        btrans = 'none', defaultvalue=None, **kwargs):
         """
@@ -458,6 +457,14 @@ class MartheGridParam():
             self.izone = MartheField(f'i{self.parname}', izone, self.mobj.mm, use_imask=self.mobj.use_imask)
             self.izone_file = izone
 
+        # ---- Reset cached (layer, zone) cell indices of previous izone
+        self._lz_idx = {}
+
+        # ---- Fetch all (layer, zone) pairs of izone once (shared by zpc/pp initialization)
+        lays, zvals = self.izone.data['layer'], self.izone.data['value']
+        nz = (zvals != 0) & (lays < self.nlay) & ~np.isnan(zvals)
+        self._lz_pairs = np.unique(np.column_stack([lays[nz], zvals[nz]]), axis=0)
+
         # ---- Initialize zpc/pp data
         self.init_zpc_df()
         self.init_pp_dic()
@@ -486,14 +493,9 @@ class MartheGridParam():
 
         """
         # ---- Get value according to activeness, layer and zone id
-        mask = np.logical_and.reduce( 
-            [ 
-            self.izone.get_data(layer=layer, masked_values=self.izone.dmv, as_mask=True),
-            self.izone.data['value'] == zone
-                ]
-            )
+        idx = self._lz_cells(layer, zone)
 
-        dv = self.mobj.data['value'][mask]
+        dv = self.mobj.data['value'][idx]
 
         # ---- Return default value (with(out) aggregation)
         if agg is None:
@@ -542,27 +544,28 @@ class MartheGridParam():
         """
         Initialise zone of piecewise constancy DataFrame
         """
-        # ---- Initialize zpc data lists
-        _names, _zones, _layers, _dvs = [[] for _ in range(4)]
+        # ---- Get (layer, zone) pairs of zpc (zone id < 0)
+        pairs = self._lz_pairs[self._lz_pairs[:,1] < 0]
+        _layers, _zones = pairs[:,0].astype(int), pairs[:,1].astype(int)
 
-        # ---- Build data ietrating over layers and zones
-        for ilay in range(self.nlay):
-            # -- Fetch zone ids
-            zones = np.unique(self.izone.get_data(layer=ilay)['value'])
-            for zone in zones :
-                # -- Perform zpc computation only when zone id < 0
-                if zone < 0 :
-                    # -- Build parname
-                    _names.append(ZPCFMT(self.parname, ilay, zone))
-                    _layers.append(ilay)
-                    _zones.append(int(zone))
-                    # -- Manage not provided default value
-                    dv = self.get_dv_from_lz(ilay, zone, agg='mean') if self.defaultvalue is None else self.defaultvalue
-                    _dvs.append(dv)
+        # ---- Build parnames
+        _names = ZPCFMTS(self.parname, _layers, _zones)
+
+        # ---- Manage not provided default value (mean field value of active cells by layer and zone)
+        if self.defaultvalue is None:
+            lays, zvals = self.izone.data['layer'], self.izone.data['value']
+            act = np.logical_and.reduce([zvals < 0,
+                                         ~np.isin(zvals, self.izone.dmv),
+                                         lays < self.nlay])
+            means = pd.Series(self.mobj.data['value'][act]).groupby(
+                                [lays[act], zvals[act]]).mean()
+            _dvs = means.reindex(pd.MultiIndex.from_arrays([_layers, pairs[:,1]])).values
+        else:
+            _dvs = [self.defaultvalue] * len(_names)
 
-        # ---- Set zpc DataFrame from data
-        zpc_df = pd.DataFrame({'parname':_names, 'layer':_layers, 'zone':_zones, 'value': _dvs})
-        self.zpc_df = zpc_df.set_index('parname', drop=False)
+        # ---- Set zpc DataFrame from data (indexed by names at construction)
+        self.zpc_df = pd.DataFrame({'parname':_names, 'layer':_layers, 'zone':_zones, 'value': _dvs},
+                                   index = pd.Index(_names, name='parname'))
 
 
 
@@ -593,17 +596,16 @@ class MartheGridParam():
         """
         # ---- Check value integrity
         err_msg = f"ERROR : `value` must be numerical. Given {value}."
-        assert isinstance(value, (int,float)), err_msg
+        assert isinstance(value, (int,float,np.number)), err_msg
 
-        # ---- Manage inputs (iterables)
-        _zone = self.zpc_df.zone.unique() if zone is None else marthe_utils.make_iterable(zone)
-        _layer = list(range(self.nlay)) if zone is None else marthe_utils.make_iterable(layer)
+        # ---- Build mask on raw column arrays (None means no filter)
+        mask = np.ones(len(self.zpc_df), dtype=bool)
+        if layer is not None:
+            mask &= np.isin(self.zpc_df['layer'].values, marthe_utils.make_iterable(layer))
+        if zone is not None:
+            mask &= np.isin(self.zpc_df['zone'].values, marthe_utils.make_iterable(zone))
 
-        # ---- Query and set zpc inplace
-        mask = np.logical_and.reduce(
-                   [ self.zpc_df.layer.isin(_layer),
-                     self.zpc_df.zone.isin(_zone) ]
-                     )
+        # ---- Set zpc values inplace
         self.zpc_df.loc[mask,'value'] = value
 
 
@@ -620,37 +622,34 @@ class MartheGridParam():
         # ---- Prepare empty pilot point dictionary
         self.pp_dic = {}
 
-        # ---- Iterate over layer and positive zones to set pilot point DataFrames
-        for ilay in range(self.nlay):
-            ldata = self.izone.get_data(layer=ilay, masked_values=self.izone.dmv)
-            zones = np.unique(ldata['value']).astype(int)
-            # -- Search for at least 1 defined zpc 
-            if len(zones) >= 1:
-                pp_dfs = []
-                for zone in zones:
-                    if zone > 0:
-                        # -- Try to get pilot point coordinates if provided
-                        try:
-                            ppobj = self.pp_data[ilay][zone]
-                            # ---- Manage pilot point input object
-                            coords = shp_utils.shp2points(ppobj) if isinstance(ppobj, str) else ppobj
-                        # -- Get izone cell centers as pilot point coordinates if not provided
-                        except:
-                            # -- Warn about default behaviour
-                            msg = f"WARNING : pilot point coordinates not provided for layer = {ilay}" \
-                                  f" and zone = {int(zone)}. Default pilot points will be generated."
-                            warnings.warn(msg)
-                            coords = self.default_pp_coords(layer=ilay, zone=int(zone))
-                        # -- Build DataFrame from pilot point coordinates
-                        pp_df = self.build_pp_df(coords, layer=ilay, zone=int(zone))
-                        pp_dfs.append(pp_df)
-                    else:
-                        pp_dfs.append(pd.DataFrame())
-
-                # -- Set zone pilot point data for current layer
-                pp_df = pd.concat(pp_dfs)
-                if not pp_df.empty:
-                    self.pp_dic[ilay] = pp_df
+        # ---- Get (layer, zone) pairs of pilot point zones (active zone id > 0)
+        zones = self._lz_pairs[:,1]
+        pos = np.logical_and(zones > 0, ~np.isin(zones, self.izone.dmv))
+        pairs = np.unique(self._lz_pairs[pos].astype(int), axis=0).reshape(-1,2)
+
+        # ---- Iterate only over layers containing pilot point zones
+        for ilay in map(int, np.unique(pairs[:,0])):
+            pp_dfs = []
+            for zone in map(int, pairs[pairs[:,0] == ilay, 1]):
+                # -- Try to get pilot point coordinates if provided
+                try:
+                    ppobj = self.pp_data[ilay][zone]
+                    # ---- Manage pilot point input object
+                    coords = shp_utils.shp2points(ppobj) if isinstance(ppobj, str) else ppobj
+                # -- Get izone cell centers as pilot point coordinates if not provided
+                except:
+                    # -- Warn about default behaviour
+                    msg = f"WARNING : pilot point coordinates not provided for layer = {ilay}" \
+                          f" and zone = {zone}. Default pilot points will be generated."
+                    warnings.warn(msg)
+                    coords = self.default_pp_coords(layer=ilay, zone=zone)
+                # -- Build DataFrame from pilot point coordinates
+                pp_dfs.append(self.build_pp_df(coords, layer=ilay, zone=zone))
+
+            # -- Set zone pilot point data for current layer
+            pp_df = pd.concat(pp_dfs)
+            if not pp_df.empty:
+                self.pp_dic[ilay] = pp_df
 
 
 
@@ -674,23 +673,36 @@ class MartheGridParam():
         mgp.zone_interp_coords(layer=0, zone=-1)
 
         """
-        # ---- Build layer, zone, active mask
-        mask = np.logical_and.reduce(
-                    [   
-                        self.izone.get_data(
-                                masked_values= self.izone.dmv,
-                                layer=layer, as_mask=True),
-                        self.izone.data['value'] == zone 
-                    ]
-                 )
-        # ---- Extract centroid coordinates
-        xc = self.izone.data[mask]['x']
-        yc = self.izone.data[mask]['y']
+        # ---- Get layer, zone, active cell indices
+        idx = self._lz_cells(layer, zone)
+        # ---- Extract centroid coordinates (from field views, no record copy)
+        xc = self.izone.data['x'][idx]
+        yc = self.izone.data['y'][idx]
         # ---- Return coordinates
         return xc, yc
 
 
 
+    def _lz_cells(self, layer, zone):
+        """
+        Indices of active izone cells for a given layer and zone id.
+        Single pass over layer and zone ids (masked zone ids never match).
+        Indices are cached lazily until the next .set_izone() call
+        (each cell belongs to a single pair, so the cache never exceeds
+        the number of model cells), they must be considered as read-only.
+        """
+        key = (int(layer), int(zone))
+        if key not in self._lz_idx:
+            if zone in self.izone.dmv:
+                idx = np.array([], dtype=np.intp)
+            else:
+                idx = np.flatnonzero(np.logical_and(self.izone.data['layer'] == layer,
+                                                    self.izone.data['value'] == zone))
+            self._lz_idx[key] = idx
+        return self._lz_idx[key]
+
+
+
     def default_pp_coords(self, layer, zone):
         """
         Infer pilot point coordinates for a specific zone in a required layer.
@@ -719,9 +731,7 @@ class MartheGridParam():
         assert np.any(self.izone.get_data(layer=layer)['value'] > 0), err_msg
 
         # ---- Get active data for required layer and zone
-        m = self.izone.get_data(layer=layer, masked_values=self.izone.dmv, as_mask=True)
-        mask = np.logical_and(m, self.izone.data['value'] == zone)
-        rec = self.izone.data[mask]
+        rec = self.izone.data[self._lz_cells(layer, zone)]
 
         # ---- Get extent on current active layer
         xmin, ymin = map(np.min, [rec['x'], rec['y']])
@@ -741,10 +751,14 @@ class MartheGridParam():
         ppxx, ppyy = np.meshgrid(np.linspace(xmin, xmax, nx), np.linspace(ymin, ymax, ny))
 
         # ---- Remove points that are in inactive cells
+        #      (query spatial index directly: no field-size mask per point)
+        if self.izone.mm.spatial_index is None:
+            self.izone.mm.build_spatial_index()
+        si, values = self.izone.mm.spatial_index, self.izone.data['value']
         pp_coords = []
         for px, py in zip(ppxx.ravel(), ppyy.ravel()):
-            sample_value = self.izone.sample(px,py,layer=layer)['value']
-            if not sample_value in self.izone.dmv:
+            idx = [hit[0] for hit in si.intersection((px,py), objects='raw') if hit[1] == layer]
+            if not np.isin(values[idx], self.izone.dmv).any():
                 pp_coords.append([px,py])
 
         # ---- Return generated pilot points
@@ -1023,6 +1037,9 @@ class MartheGridParam():
                     assert sorted(obj.keys()) == sorted(self.pp_dic[ilay].zone.unique()), err_msg
                     vgmr[ilay] = obj
 
+        # ---- Import pyemu geostatistical tools only when required
+        import pyemu
+
         # ---- Iterate over each layer and zone
         for ilay, pp_df in self.pp_dic.items():
             for zone, zpp_df in pp_df.groupby('zone'):
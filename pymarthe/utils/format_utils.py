@@ -0,0 +1,45 @@
+"""
+Contains string formatters shared by parameter
+and PEST files writers.
+
+"""
+
+
+# ---- Set value formatters
+def SFMT(item):
+    # -- Only bytes need decoding (avoid raising on every other item)
+    if isinstance(item, (bytes, bytearray)):
+        try:
+            return "{0:<20s} ".format(item.decode())
+        except UnicodeDecodeError:
+            pass
+    s = "{0:<20s} ".format(str(item))
+    return(s)
+
+FFMT = lambda x: "{0:<20.10E} ".format(float(x))
+IFMT = lambda x: "{0:<10d} ".format(int(x))
+
+
+# ---- Set parameter name formatters
+# ZPC name format (layer are 0-based within Python ; 1-based out of Python)
+ZPCFMT = lambda name, lay, zone: '{0}_zpc_l{1:02d}_z{2:02d}'.format(name,int(lay)+1,int(abs(zone)))
+# pilot point name format (layer number is 0-based within Python ; 1-based out of Python)
+PPFMT = lambda name, lay, zone, ppid, digit: '{0}_l{1:02d}_z{2:02d}_{3}'.format(name,int(lay)+1,int(zone), str(int(ppid)).zfill(digit))
+
+
+# ---- Set multiple parameter names formatters (single printf-style template)
+def ZPCFMTS(name, lays, zones):
+    """
+    Build ZPC names for all (layer, zone) pairs at once.
+    Same output as [ZPCFMT(name, lay, zone) for lay, zone in zip(lays, zones)].
+    """
+    tpl = name.replace('%', '%%') + '_zpc_l%02d_z%02d'
+    return [tpl % (lay + 1, abs(zone)) for lay, zone in zip(map(int, lays), map(int, zones))]
+
+def PPFMTS(name, lay, zone, n):
+    """
+    Build names of n pilot points (ids 0 to n-1) of a layer and zone at once.
+    Same output as [PPFMT(name, lay, zone, i, len(str(n))) for i in range(n)].
+    """
+    tpl = '{0}_l{1:02d}_z{2:02d}_%0{3}d'.format(name.replace('%', '%%'), int(lay)+1, int(zone), len(str(n)))
+    return [tpl % i for i in range(n)]
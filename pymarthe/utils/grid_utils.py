@@ -3,6 +3,7 @@ Contains the MartheGrid class
 Handle single Marthe grid
 """
 
+import io
 import numpy as np
 import pandas as pd
 import re
@@ -58,7 +59,8 @@ class MartheGrid():
         self.origin = (self.xl, self.yl)
         self.xcc    = xcc.astype(float)
         self.ycc    = ycc.astype(float)
-        self.array  = array.astype(float)
+        # -- Keep floating point type of values (e.g. float32 models)
+        self.array  = array if np.issubdtype(array.dtype, np.floating) else array.astype(float)
         self.xvertices = np.append(np.array(self.xl), self.xl + np.cumsum(self.dx))
         self.yvertices = np.append(np.array(self.yl), self.yl + np.cumsum(self.dy))
         self.isnested = True if inest != 0 else False
@@ -109,10 +111,6 @@ class MartheGrid():
         mg.to_records(fmt='light')
         """
         rows, cols = [np.arange(0 + base, n + base) for n in [self.nrow,self.ncol]]
-        ii, jj = np.meshgrid(rows, cols, indexing='ij')
-        xx, yy = np.meshgrid(self.xcc, self.ycc, indexing='xy')
-        ll = self.layer * np.ones((self.nrow, self.ncol))
-        nn = self.inest * np.ones((self.nrow, self.ncol))
         array = self.array
         dt = [('layer', '<i8'), ('inest', '<i8'),
               ('i', '<i8'), ('j', '<i8'),
@@ -120,17 +118,25 @@ class MartheGrid():
 
         # ---- Manage 'light' recarray
         if fmt == 'light':
-            # -- Collect data infos
-            data = [ll,nn,ii,jj,xx,yy,array]
-            it = list(map(np.ravel, data))
+            # -- Allocate recarray once and fill fields from 1D row/column data
+            #    (no 2D meshgrid temporaries)
             dt.append(('value', '<f8'))
-            # -- Build recarray from arrays
-            rec = np.rec.fromarrays(it, dtype=dt)
+            rec = np.recarray(self.nrow * self.ncol, dtype=dt)
+            rec['layer'], rec['inest'] = self.layer, self.inest
+            rec['i'] = np.repeat(rows, self.ncol)
+            rec['j'] = np.tile(cols, self.nrow)
+            rec['x'] = np.tile(self.xcc, self.nrow)
+            rec['y'] = np.repeat(self.ycc, self.ncol)
+            rec['value'] = array.ravel()
             # -- Return rec.array
             return rec
 
         # ---- Manage 'full' recarray
         elif fmt == 'full':
+            ii, jj = np.meshgrid(rows, cols, indexing='ij')
+            xx, yy = np.meshgrid(self.xcc, self.ycc, indexing='xy')
+            ll = np.full((self.nrow, self.ncol), self.layer, dtype='<i8')
+            nn = np.full((self.nrow, self.ncol), self.inest, dtype='<i8')
             # -- Extract cell sizes and area
             dxx, dyy = np.meshgrid(self.dx, self.dy, indexing= 'xy')
             area = dxx*dyy
@@ -194,7 +200,7 @@ class MartheGrid():
             xcc = np.r_[ self.xcc[0] - (dx[1] + dx[0])/2, self.xcc, self.xcc[-1] + (dx[-2] + dx[-1])/2]
             ycc = np.r_[ self.ycc[0] + (dy[1] + dy[0])/2, self.ycc, self.ycc[-1] - (dy[-2] + dy[-1])/2] # reversed direction
             xl, yl = xcc.min() - (dx[0]/2), ycc.min() - (dy[0]/2)
-            array = marthe_utils.bordered_array(self.array, 0) # set bordered array with value 0
+            array = marthe_utils.bordered_array(self.array, 0).astype(self.array.dtype) # set bordered array with value 0
             nrow, ncol = array.shape
 
         # ---- Manage nested grid number as str 
@@ -225,7 +231,8 @@ class MartheGrid():
         lines.append('Nrows={}'.format(nrow))
         if np.logical_and(self.isuniform, keep_uniform_fmt):
             uv = np.unique(array[~np.isin(array,[-9999,0,8888,9999])])
-            uniform_value = 0 if len(uv) == 0 else uv[0]
+            # -- Shortest repr at the value own precision (e.g. float32)
+            uniform_value = 0 if len(uv) == 0 else float(str(uv[0]))
             # uniform_value = 0 if np.isnan(uniform_value) else uniform_value            
             lines.append('[Constant_Data]')
             lines.append('Uniform_Value={}'.format(uniform_value))
@@ -250,10 +257,16 @@ class MartheGrid():
             lines.append('[Data]')
             lines.append('\t'.join(['0','0'] + [str(i+1) for i in range(ncol)]))
             lines.append('\t'.join(['0','0'] + [str(i) for i in xcc]))
-            for i in range(nrow):
-                line_data = [i+1, ycc[i], *array[i,:], dy[i]]
-                line_str = list(map(str,line_data))
-                lines.append('\t'.join(line_str))
+            # -- Values with lower precision (e.g. float32) are converted through their
+            #    shortest repr so that they are not written as their float64 expansion
+            #    ('5e-06', not '4.999999873689376e-06') when stacked with float64 columns
+            if array.dtype != np.float64:
+                array = array.astype(str).astype(np.float64)
+            # -- Format all data rows at once (row id, ycc, values, dy)
+            buff = io.StringIO()
+            np.savetxt(buff, np.column_stack([np.arange(1, nrow+1), ycc, array, dy]),
+                       fmt= ['%d'] + ['%s']*(ncol+2), delimiter='\t', newline='\n')
+            lines.append(buff.getvalue()[:-1])
             lines.append('\t'.join(['0','0'] + [str(i) for i in dx]))
         # ---- Append end grid tag
         lines.append('[End_Grid]')
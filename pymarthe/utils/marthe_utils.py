@@ -618,20 +618,25 @@ def read_grid_file(grid_file, keep_adj=False, start=None, end=None):
             # -- Build uniform array
             array = np.full((len(rows),len(cols)), value)
         else:
-            # -- Extract 2D-array from string
-            arr_list = [np.fromstring(line.strip(), sep='\t', dtype = float)
-
-                       for line
-                       in str_grid.splitlines()]
-            array = np.stack([a[2:-1] for a in arr_list[2:-1]], axis=0)
+            # -- Parse the whole data block at once (any whitespace separator)
+            #    instead of converting it line by line
+            flat = np.fromstring(str_grid, sep=' ', dtype=float)
+            # -- Split flat data according to the Marthe grid layout:
+            #       - 2 header lines of (ncol + 2) values (column ids, xcc)
+            #       - nrow lines of (ncol + 3) values (i, ycc, values, dy)
+            #       - 1 footer line of (ncol + 2) values (dx)
+            _ncol = int(ncol)
+            nhead = 2 * (_ncol + 2)
+            rows_arr = flat[nhead:-(_ncol + 2)].reshape(int(nrow), _ncol + 3)
+            array = rows_arr[:, 2:-1]
             # -- Convert to mask array if nested
             # if float(inest) > 0:
             #     array = np.ma.masked_array(array,
             #             mask= array == -9999.,
             #             fill_value = -9999.)
             # -- Search x/y cell centers and x/y cell resolution
-            xcc, dx = arr_list[1][2:], arr_list[-1][2:]
-            ycc, dy = np.dstack([l[[1,-1]] for l in arr_list[2:-1]])[0]
+            xcc, dx = flat[_ncol + 4:nhead], flat[-_ncol:]
+            ycc, dy = rows_arr[:, 1], rows_arr[:, -1]
         # -- Switch to 0-based
         layer = int(layer) - 1
         # -- Store arguments in tuple
@@ -664,6 +669,78 @@ def read_grid_file(grid_file, keep_adj=False, start=None, end=None):
 
 
 
+# ---- Minimum file size (in bytes) for a grid file to be memoized
+GRID_CACHE_MIN_SIZE = 1 << 20
+
+
+@functools.lru_cache(maxsize=8)
+def _read_grid_file_memo(grid_file, mtime_ns, size, keep_adj):
+    """
+    Memoized version of read_grid_file().
+    `mtime_ns` and `size` are only used as cache keys so that
+    any modification of the grid file invalidates the entry.
+    """
+    return read_grid_file(grid_file, keep_adj=keep_adj)
+
+
+
+def read_grid_file_cached(grid_file, keep_adj=False):
+    """
+    Function to read Marthe grid data in file with memoization
+    on (path, modification time, size).
+    Only large grid files (>= GRID_CACHE_MIN_SIZE) are cached,
+    smaller ones are simply parsed with read_grid_file().
+    Note: a file rewritten with the same size within the file system
+          modification time resolution is not detected, use
+          clear_grid_cache() in such case.
+    /!/ CAREFULL /!/ cached MartheGrid instances are returned
+    as is (no copy) and must not be modified inplace.
+
+    Parameters:
+    ----------
+    grid_file (str) : Marthe Grid file full path
+
+    keep_adj (bool) : whatever conserving adjacent cells
+                      for nested grids.
+                      Default is False.
+
+    Returns:
+    --------
+    grid_list (list) : contain one or more
+                        MartheGrid instance
+                        (shared with the cache, read-only)
+
+    Examples:
+    --------
+    grids = read_grid_file_cached('mymodel.permh')
+
+    """
+    # ---- Get file status
+    st = os.stat(grid_file)
+    # ---- Skip cache for small grid files
+    if st.st_size < GRID_CACHE_MIN_SIZE:
+        return read_grid_file(grid_file, keep_adj=keep_adj)
+    # ---- Fetch memoized grids
+    mgs = _read_grid_file_memo(os.path.abspath(grid_file),
+                               st.st_mtime_ns, st.st_size, keep_adj)
+    # ---- Return cached grids (read-only, see note above)
+    return mgs
+
+
+
+def clear_grid_cache():
+    """
+    Clear memoized grid files (see read_grid_file_cached()).
+
+    Examples:
+    --------
+    clear_grid_cache()
+    """
+    _read_grid_file_memo.cache_clear()
+
+
+
+
 
 def replace_text_in_file(file, match, subs, flags=0):
     """
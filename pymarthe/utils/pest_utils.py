@@ -3,9 +3,9 @@ import os
 import numpy as np
 import pandas as pd
 import re, ast
-import pyemu
 
 from pymarthe.utils import ts_utils, marthe_utils
+from pymarthe.utils.format_utils import SFMT, FFMT, IFMT
 
 ############################################################
 #        Utils for pest preprocessing for Marthe
@@ -22,44 +22,142 @@ encoding = 'latin-1'
 
 
 # ---- Set formater dictionaries
-def SFMT(item):
-    try:
-        s = "{0:<20s} ".format(item.decode())
-    except:
-        s = "{0:<20s} ".format(str(item))
-    return(s)
-
-FFMT = lambda x: "{0:<20.10E} ".format(float(x))
-IFMT = lambda x: "{0:<10d} ".format(int(x))
-
 FMT_DIC = {"obsnme": SFMT, "obsval": FFMT, "ins_line": SFMT, "date": SFMT,"value": FFMT,
            "name": SFMT, "parnme": SFMT, "x": FFMT, "y": FFMT, "zone": IFMT,
            "transformed":FFMT, "tplnme": SFMT,"defaultvalue": FFMT}
 
 
+# ---- Set printf-style equivalents of numeric value formatters
+PRINTF_DIC = {FFMT: '%-20.10E ', IFMT: '%-10d '}
+
+
 # ---- Set observation character start and length
 VAL_START, VAL_END = 23, 39
 
 
+# ---- Set write buffer size of PEST files (bytes)
+WRITE_BUFF_SIZE = 1 << 20
+
+
+
+def format_lines(df, cols):
+    """
+    Format DataFrame (or dictionary of columns) as fixed-width text lines.
+    Each column is fully formatted in memory first (column width is
+    required), only the joined lines are then generated one by one.
+    Fast equivalent (no per-cell pandas formatting machinery) of :
+        df.to_string(col_space=0, columns=cols,
+                     formatters=FMT_DIC, justify="left",
+                     header=False, index=False)
+
+    Parameters
+    ----------
+    df (DataFrame/dict) : data to format.
+                          Can be a dictionary of column arrays/Series
+                          (avoid copying a DataFrame to add a column).
+    cols (list) : column names to format (in order).
+
+    Returns
+    --------
+    lines (generator) : formatted lines (without newline character).
+
+    Examples
+    --------
+    lines = format_lines(param_df, ['parname', 'transformed'])
+
+    """
+    scols, widths = [], []
+    for col in cols:
+        # -- Manage empty data
+        if len(df[col]) == 0:
+            return
+        fmt = FMT_DIC.get(col, str)
+        # -- Numeric formatter : printf-style (missing values are not formatted)
+        if fmt in PRINTF_DIC:
+            pfmt = PRINTF_DIC[fmt]
+            values = np.asarray(df[col]).astype(float if fmt is FFMT else int).tolist()
+            scol = ['NaN' if v != v else pfmt % v for v in values]
+        # -- String formatter (iterate on items to keep their own str(), e.g. Timestamp)
+        else:
+            scol = list(map(fmt, df[col]))
+        scols.append(scol)
+        widths.append(max(map(len, scol)))
+    # ---- Right justify on column width (as pandas does for formatted cells)
+    line = ' '.join('{:>%d}' % w for w in widths)
+    for row in zip(*scols):
+        yield line.format(*row)
+
+
+
+
+def write_lines(f, lines):
+    """
+    Write lines to an opened file, separated by newline
+    characters (no trailing newline, as DataFrame.to_string()).
+    Avoid joining the whole file content in a single string, the
+    streaming itself relies on the file buffer (see WRITE_BUFF_SIZE).
+
+    Parameters
+    ----------
+    f (file object) : opened file to write in.
+    lines (iterable) : lines to write (without newline character).
+
+    Examples
+    --------
+    with open('hk_zpc.dat', 'w') as f:
+        write_lines(f, format_lines(param_df, ['parname', 'transformed']))
+
+    """
+    it = iter(lines)
+    first = next(it, None)
+    if first is not None:
+        f.write(first)
+        f.writelines('\n' + l for l in it)
+
+
+
 
 def write_mgp_parfile(parfile, param_df, trans, ptype='zpc'):
     """
     """
-    # ---- Apply required transformation
-    df = param_df.copy(deep=True)
-    df['transformed'] = transform(df['value'], trans)
     # ---- Manage zpc parameter file
     if ptype == 'zpc':
         cols = ['parname', 'transformed']
     # ---- Manage zpc parameter file (own writer)
     elif ptype == 'pp':
         cols = ['parname', 'x', 'y', 'zone', 'transformed']
+    # ---- Apply required transformation (columns views, no DataFrame copy)
+    df = {col: param_df[col] for col in cols[:-1]}
+    df['transformed'] = transform(param_df['value'], trans)
     # ---- Write parameter file with correct formatted columns
-    with open(parfile, 'w', encoding=encoding) as f:
-            f.write(df.to_string( col_space=0, columns=cols,
-                                  formatters=FMT_DIC, justify="left",
-                                  header=False, index=False, index_names=False,
-                                  max_rows = len(df), min_rows = len(df) ) )
+    with open(parfile, 'w', encoding=encoding, buffering=WRITE_BUFF_SIZE) as f:
+        write_lines(f, format_lines(df, cols))
+
+
+
+def read_parfile(parfile):
+    """
+    Read parameter names and values of a 2-columns
+    whitespace-delimited parameter file.
+
+    Parameters
+    ----------
+    parfile (str) : path to parameter file.
+
+    Returns
+    --------
+    parnames (array) : parameter names.
+    values (array) : parameter values (float).
+
+    Examples
+    --------
+    parnames, values = read_parfile('par/hk_zpc.dat')
+
+    """
+    # ---- Load as plain strings (avoid pandas parser overhead on small files)
+    arr = np.loadtxt(parfile, dtype=str, usecols=(0,1), ndmin=2)
+    return arr[:,0], arr[:,1].astype(np.float64)
+
 
 
 
@@ -76,31 +174,27 @@ def parse_mgp_parfile(parfile, btrans):
     if '_zpc' in f:
         # -- Get parameter type and Dataframe
         ptype = 'zpc'
-        par_df = pd.read_csv(parfile, header=None,
-                                  delim_whitespace=True,
-                                  names = ['parname', 'value'])
+        parnames, values = read_parfile(parfile)
         # -- Back-transform values
-        par_df['bvalue'] = transform(par_df['value'], btrans)
-        # -- Parse names adding new columns
-        parse_df = par_df.parname.str.extract(re_lz)
-        par_df['layer'] = parse_df.iloc[:,0].astype(int)-1 # back to 0-based
-        par_df['zone'] = parse_df.iloc[:,1].astype(int).mul(-1) # zpc negative for ZPCs
-        # -- Transform to records to iteration process easielayer are r
-        rec = par_df[['layer','zone', 'bvalue']].to_records(index=False)
+        bvalues = transform(values, btrans).to_numpy()
+        # -- Parse layer and zone ids from names
+        lz = np.array([re.search(re_lz, n).groups() for n in parnames], dtype=np.int64).reshape(-1,2)
+        layers = lz[:,0] - 1    # back to 0-based
+        zones = -lz[:,1]        # zpc negative for ZPCs
+        # -- Transform to records to iteration process easier
+        rec = np.rec.fromarrays([layers, zones, bvalues], names=['layer','zone','bvalue'])
         # -- Return zpc parsed as recarray
         return ptype, rec
 
     if '_pp' in f:
         # -- Get parameter type and Dataframe
         ptype = 'pp'
-        par_df = pd.read_csv(parfile, header=None,
-                                  delim_whitespace=True,
-                                  names = ['parname', 'x', 'y', 'zone', 'value'])
         # -- Parse parameter file name
         ilay, zone = map(int, re.search(re_lz, f).groups())
         # back to 0-based
         ilay+=-1
         # -- Passing from factors to real field values (wrapper to pyemu .fac2real())
+        import pyemu
         values = pyemu.utils.geostats.fac2real(
                                 pp_file = parfile,
                                 factors_file = parfile.replace('.dat','.fac'),
@@ -117,44 +211,36 @@ def parse_mgp_parfile(parfile, btrans):
 def write_mgp_tplfile(tplfile, param_df, ptype='zpc'):
     """
     """
-    df = param_df.copy(deep=True)
-    df['tplnme'] = '~' + df.parname.str.lower() + '~'
     if ptype == 'zpc':
         cols = ['parname', 'tplnme']
     elif ptype == 'pp':
         cols = ['parname', 'x', 'y', 'zone', 'tplnme']
-    with open(tplfile, 'w', encoding=encoding) as f:
+    # -- Add template entries to columns views (no DataFrame copy)
+    df = {col: param_df[col] for col in cols[:-1]}
+    df['tplnme'] = ['~' + n.lower() + '~' for n in param_df['parname']]
+    with open(tplfile, 'w', encoding=encoding, buffering=WRITE_BUFF_SIZE) as f:
         f.write('ptf ~\n')
-        f.write(df.to_string(col_space=0, columns=cols,
-                                   formatters=FMT_DIC, justify="left",
-                                   header=False, index=False, index_names=False,
-                                   max_rows = len(df), min_rows = len(df)))
+        write_lines(f, format_lines(df, cols))
 
 
 
 def write_mlp_tplfile(tplfile, param_df):
     """
     """
-    df = param_df.copy(deep=True)
-    df['tplnme'] = '~' + df['parnme'].str.replace('__', '_')  + '~'
-    with open(tplfile, 'w', encoding=encoding) as f:
+    df = {'parnme': param_df['parnme'],
+          'tplnme': ['~' + n.replace('__', '_') + '~' for n in param_df['parnme']]}
+    with open(tplfile, 'w', encoding=encoding, buffering=WRITE_BUFF_SIZE) as f:
         f.write('ptf ~\n')
-        f.write(df.to_string(col_space=0, columns=['parnme', 'tplnme'],
-                                   formatters=FMT_DIC, justify="left",
-                                   header=False, index=False, index_names=False,
-                                   max_rows = len(df), min_rows = len(df)))
+        write_lines(f, format_lines(df, ['parnme', 'tplnme']))
 
 
 def write_mlp_parfile(parfile, param_df, trans='none', value_col='defaultvalue'):
     """
     """
-    df = param_df.copy(deep=True)
-    df['transformed'] = transform(param_df[value_col], trans)
-    with open(parfile, 'w', encoding=encoding) as f:
-        f.write(df.to_string(col_space=0, columns=['parnme', 'transformed'],
-                             formatters=FMT_DIC, justify="left",
-                             header=False, index=False, index_names=False,
-                             max_rows = len(df), min_rows = len(df)))
+    df = {'parnme': param_df['parnme'],
+          'transformed': transform(param_df[value_col], trans)}
+    with open(parfile, 'w', encoding=encoding, buffering=WRITE_BUFF_SIZE) as f:
+        write_lines(f, format_lines(df, ['parnme', 'transformed']))
 
 
 
@@ -172,18 +258,16 @@ def write_mlp_parfile(parfile, param_df, trans='none', value_col='defaultvalue')
 def parse_mlp_parfile(parfile, keys, value_col, btrans):
     """
     """
-    par_df = pd.read_csv(parfile, header=None,
-                                  delim_whitespace=True,
-                                  names = ['parnme','value'])
+    parnames, values = read_parfile(parfile)
     items = []
-    for ipar in par_df.parnme:
+    for ipar in parnames:
         parsed = ipar.split('__')
         items.append([ast.literal_eval(s) 
                           if s.isnumeric() 
                           else s 
                           for s in parsed])
     kmi = pd.MultiIndex.from_tuples(items, names = keys)
-    bvalues = transform(par_df['value'], btrans)
+    bvalues = transform(values, btrans)
     return kmi, bvalues
 
 
@@ -371,12 +455,9 @@ def write_insfile(obsnmes, insfile):
     df = pd.DataFrame(dict(obsnme = obsnmes))
     df['ins_line'] = df['obsnme'].apply(lambda s: 'l1 ({}){}:{}'.format(s,VAL_START,VAL_END))
     # ---- Write formated instruction file
-    with open(insfile,'w', encoding=encoding) as f:
+    with open(insfile,'w', encoding=encoding, buffering=WRITE_BUFF_SIZE) as f:
         f.write('pif ~\n')
-        f.write(df.to_string(col_space=0, columns=["ins_line"],
-                             formatters=FMT_DIC, justify="left",
-                             header=False, index=False, index_names=False,
-                             max_rows = len(df), min_rows = len(df)))
+        write_lines(f, format_lines(df, ["ins_line"]))
 
 
 
@@ -408,14 +489,12 @@ def write_simfile(dates, values, simfile):
     sim = marthe_utils.read_prn('historiq.prn')['loc_name']
     write_simfile(dates = sim.index, sim, 'mysimfile.dat')
     """
-    # ---- Build instruction lines
-    df = pd.DataFrame(dict(date= dates, value = values))
-    # ---- Write formated instruction file
-    with open(simfile,'w', encoding=encoding) as f:
-        f.write(df.to_string(col_space=0, columns=["date", "value"],
-                             formatters=FMT_DIC, justify="left",
-                             header=False, index=False, index_names=False,
-                             max_rows = len(df), min_rows = len(df)))
+    # ---- Format date and value columns
+    #      (same layout as DataFrame.to_string() with FMT_DIC formatters)
+    data = {'date': dates, 'value': values}
+    # ---- Write formated simulated file
+    with open(simfile,'w', encoding=encoding, buffering=WRITE_BUFF_SIZE) as f:
+        write_lines(f, format_lines(data, ['date', 'value']))
 
 
 
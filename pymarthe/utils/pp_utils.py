@@ -7,10 +7,11 @@ Pilot Points tools
 import os, sys
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import platform
 from pymarthe import MartheModel, MartheField
 from pymarthe.utils import marthe_utils, shp_utils
+# -- PPFMT is also imported to remain available as pymarthe.utils.pp_utils.PPFMT
+from pymarthe.utils.format_utils import PPFMT, PPFMTS
 
 import warnings
 '''
@@ -18,8 +19,6 @@ Set some usefull fixed elements
 '''
 
 PP_NAMES = ["parname","x","y","zone","value"]
-# pilot point name format (layer number is 0-based within Python ; 1-based out of Python)
-PPFMT = lambda name, lay, zone, ppid, digit: '{0}_l{1:02d}_z{2:02d}_{3}'.format(name,int(lay)+1,int(zone), str(int(ppid)).zfill(digit))
 ZONE_KWARGS = {'color':'black', 'lw':1.5, 'label':'pilot points active zone'}
 BUFFER_KWARGS = {'color':'green', 'ls':'--', 'lw':1.2, 'label':'pilot points active zone (buffer)'}
 PP_KWARGS = {'s':20, 'marker':'+','lw':0.8 , 'color':'red', 'zorder':50, 'label':'pilot points'}
@@ -362,6 +361,9 @@ class PilotPoints():
         plt.show()
 
         """
+        # -- Import matplotlib only when plotting
+        import matplotlib.pyplot as plt
+
         # -- Manage kwargs
         z_kwg, b_kwg, p_kwg  = [d.copy() for d in [ZONE_KWARGS, BUFFER_KWARGS, PP_KWARGS]]
         z_kwg.update(zone_kwargs)
@@ -434,7 +436,7 @@ class PilotPoints():
 
         """
         pp_data = {layer:{zone:None if mp is None
-                                    else [[p.x,p.y] for p in mp['pp'].geoms]}
+                                    else np.array([[p.x,p.y] for p in mp['pp'].geoms])}
                                     for layer, d in self.data.items()
                                     for zone, mp in d.items()}
         return pp_data
@@ -478,17 +480,21 @@ class PilotPoints():
         pp_df = PilotPoints.pp_df_from_coords(parname='myfield', coords, layer=4, zone=1)
 
         """
+        # -- Convert coordinates once to a (N,2) float array
+        xy = np.asarray(coords, dtype=float).reshape(-1, 2)
+        n = len(xy)
         # -- Manage value input
         if len(marthe_utils.make_iterable(value)) == 1:
-            value = np.tile(value, len(coords))
+            value = np.tile(value, n)
         # -- Generate names
-        digit = len(str(len(coords)))
-        ppn = [PPFMT(parname,layer, zone, i, digit) for i in  range(len(coords))]
-        # -- Build pilot point standart DataFrame
-        ppx, ppy = np.column_stack(coords)
-        pp_df = pd.DataFrame.from_dict(
-                    {k:v for k,v in zip(PP_NAMES, [ppn,ppx,ppy,zone,value])}
-                                    ).set_index('parname', drop=False)
+        ppn = PPFMTS(parname, layer, zone, n)
+        # -- Build pilot point standart DataFrame from column arrays
+        pp_df = pd.DataFrame(
+                    {k:v for k,v in zip(PP_NAMES, [ppn, xy[:,0], xy[:,1],
+                                                   np.full(n, int(zone)),
+                                                   np.asarray(value, dtype=float)])},
+                    index = pd.Index(ppn, name='parname')
+                    )
         # -- Return pilot point DataFrame
         return pp_df
 